@@ -10,7 +10,10 @@ class ApiService {
   String apiUrl = 'https://54aa2cdf6e65.ngrok-free.app';
 
   // Siguraduhin na ang endpoint ay "/check"
-  String get checkUrl => '$apiUrl/check';
+  // format=compact: isang beses lang ipinapadala ang bawat closest_text
+  // fields=: ang mga field lang na ginagamit ng report screen
+  String get checkUrl =>
+      '$apiUrl/check?format=compact&fields=text,label,confidence,closest_text';
 
   /// Tinatawagan ang Python API para i-check ang text.
   /// Ito ay inaasahan na ngayong magbalik ng ISANG LISTA ng JSON objects.
@@ -28,10 +31,13 @@ class ApiService {
       );
 
       if (response.statusCode == 200) {
-        // Ang API ay magbabalik na ngayon ng isang List<dynamic>
-        // (Listahan ng mga JSON object, isa para sa bawat sentence)
-        final List<dynamic> results = jsonDecode(response.body);
-        return results;
+        // Compact response: {"references": [...], "results": [...]}
+        // Ibinabalik pa rin bilang List<dynamic> (isang JSON object bawat sentence)
+        // na may "closest_text", para hindi magbago ang report/history screens.
+        // (Gzip ay awtomatikong dine-decompress ng http client.)
+        final Map<String, dynamic> payload =
+            jsonDecode(utf8.decode(response.bodyBytes));
+        return expandCompactResponse(payload);
       } else {
         // Nagka-error sa server (e.g., 500 Internal Server Error)
         throw Exception(
@@ -43,5 +49,19 @@ class ApiService {
       throw Exception('Failed to connect to the plagiarism API. Error: $e');
     }
   }
+
+  /// Ibinabalik ang closest_text ng bawat result mula sa "references" table.
+  static List<dynamic> expandCompactResponse(Map<String, dynamic> payload) {
+    final List<dynamic> references = payload['references'] ?? [];
+    final List<dynamic> results = payload['results'] ?? [];
+    return results.map((result) {
+      final Map<String, dynamic> expanded = Map<String, dynamic>.from(result);
+      final closestId = expanded.remove('closest_id');
+      if (closestId is int && closestId < references.length) {
+        expanded['closest_text'] = references[closestId];
+      }
+      return expanded;
+    }).toList();
+  }
 }
 
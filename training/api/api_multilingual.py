@@ -1,13 +1,12 @@
 # api_multilingual.py (Updated for Sentence Checking & CORS)
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-import json
+from typing import Optional
 import os
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from tensorflow.keras.models import load_model
 import pickle
-import re # Para sa sentence splitting
 
 # Import para sa CORS
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,17 +14,64 @@ from fastapi.middleware.cors import CORSMiddleware
 # for cosine computation
 from sklearn.metrics.pairwise import cosine_similarity
 
+# Shared corpus reader & embedding job (training/training/)
+from training.corpus_store import load_corpus
+from training.embed_references import build_reference_embeddings
+from training.embedding_projection import fit_projection, save_projection, load_projection, is_stale
+from training.sentences import split_into_sentences
+
+# Compact response encoding (fields=, format=compact, msgpack, gzip/br)
+from api.response_encoding import parse_fields, encode_response, FORMATS
+
+# Scoring defaults (shared with api/calibrate.py)
+from api.scoring_config import DEFAULTS as SCORING_DEFAULTS, SCORING_CONFIG_PATH, load_scoring_config
+
 # --------------------------
 # PATHS (Relative to where uvicorn is run - the 'api haha' folder)
 # --------------------------
 MODEL_PATH = "models/plagiarism_model_v9_multilingual.keras"
 TOKENIZER_PATH = "models/tokenizer_v9_multilingual.pkl"
 EMBEDDINGS_PATH = "models/saved_reference_embeddings_multilingual.npy"
-REFERENCE_TEXTS_PATH = "data/generated_dataset_multilingual.json"
+REFERENCE_CORPUS_PATH = "data/reference_corpus_multilingual"
+EMBEDDING_SHARDS_DIR = "models/reference_embedding_shards"
+
+# Optional na dimensionality reduction (0 = full 768-d embeddings)
+PROJECTION_DIM = int(os.environ.get("PLAGIARISHIELD_PROJECTION_DIM", "0"))
+PROJECTION_PATH = f"models/reference_projection_{PROJECTION_DIM}.npz"
+
+# --------------------------
+# SCORING (tunable)
+# --------------------------
+WEIGHT_LSTM = SCORING_DEFAULTS["weight_lstm"]
+WEIGHT_SEMANTIC = SCORING_DEFAULTS["weight_semantic"]
+LANG_MISMATCH_PENALTY = SCORING_DEFAULTS["lang_mismatch_penalty"]
+THRESHOLDS = dict(SCORING_DEFAULTS["thresholds"])
+SUSPICIOUS_MARGIN = SCORING_DEFAULTS["suspicious_margin"]
+LSTM_GATE = SCORING_DEFAULTS["lstm_gate"]
+SEMANTIC_GATE = SCORING_DEFAULTS["semantic_gate"]
+# Opt-in ang calibrated config (api/calibrate.py); tinatanggihan kapag mas mahina sa defaults
+USE_SCORING_CONFIG = os.environ.get("PLAGIARISHIELD_SCORING_CONFIG", "0") == "1"
+
+# Cascade mode: patakbuhin muna ang mas murang stage at laktawan ang isa kung sigurado na ang label
+CASCADE_MODE = os.environ.get("PLAGIARISHIELD_CASCADE", "0") == "1"
+CASCADE_FIRST_STAGE = os.environ.get("PLAGIARISHIELD_CASCADE_FIRST", "lstm")  # "lstm" o "semantic"
 
 # --------------------------
 # LOAD RESOURCES
 # --------------------------
+if USE_SCORING_CONFIG:
+    print("⚡ Loading calibrated scoring config...")
+    scoring_config = load_scoring_config(SCORING_CONFIG_PATH)
+    WEIGHT_LSTM = scoring_config.get("weight_lstm", WEIGHT_LSTM)
+    WEIGHT_SEMANTIC = scoring_config.get("weight_semantic", WEIGHT_SEMANTIC)
+    LANG_MISMATCH_PENALTY = scoring_config.get("lang_mismatch_penalty", LANG_MISMATCH_PENALTY)
+    THRESHOLDS = {**THRESHOLDS, **scoring_config.get("thresholds", {})}
+    SUSPICIOUS_MARGIN = scoring_config.get("suspicious_margin", SUSPICIOUS_MARGIN)
+    LSTM_GATE = scoring_config.get("lstm_gate", LSTM_GATE)
+    SEMANTIC_GATE = scoring_config.get("semantic_gate", SEMANTIC_GATE)
+elif os.path.exists(SCORING_CONFIG_PATH):
+    print(f"ℹ️ Ignoring {SCORING_CONFIG_PATH} (set PLAGIARISHIELD_SCORING_CONFIG=1 to use it).")
+
 print("⚡ Loading LSTM model...")
 lstm_model = load_model(MODEL_PATH)
 
@@ -34,17 +80,48 @@ with open(TOKENIZER_PATH, "rb") as f:
     tokenizer = pickle.load(f)
 
 print("⚡ Loading reference dataset...")
-with open(REFERENCE_TEXTS_PATH, "r", encoding="utf-8") as f:
-    reference_texts = [item["text"] for item in json.load(f)]
+if not os.path.exists(os.path.join(REFERENCE_CORPUS_PATH, "meta.json")):
+    raise RuntimeError(
+        f"No reference corpus at {REFERENCE_CORPUS_PATH}. It is written by training/train_multilingual.py "
+        f"together with the reference embeddings; run training first."
+    )
+# Lazy decode: text lang ng closest match ang dine-decode kada request
+reference_texts = load_corpus(REFERENCE_CORPUS_PATH)
 
 print("⚡ Loading transformer model & reference embeddings...")
 transformer_model = SentenceTransformer("paraphrase-multilingual-mpnet-base-v2")
 if os.path.exists(EMBEDDINGS_PATH):
     reference_embeddings = np.load(EMBEDDINGS_PATH)
 else:
-    print("⚡ Computing reference embeddings (one-time)...")
-    reference_embeddings = transformer_model.encode(reference_texts, convert_to_numpy=True, show_progress_bar=True, batch_size=64)
-    np.save(EMBEDDINGS_PATH, reference_embeddings)
+    print("⚡ Computing reference embeddings (one-time, resumable)...")
+    build_reference_embeddings(
+        corpus_path=REFERENCE_CORPUS_PATH,
+        output_path=EMBEDDINGS_PATH,
+        shard_dir=EMBEDDING_SHARDS_DIR,
+        # In-process gamit ang naka-load nang model; walang process pool sa loob ng API
+        model=transformer_model,
+    )
+    reference_embeddings = np.load(EMBEDDINGS_PATH)
+
+# Row i ng embeddings ay dapat text i ng reference corpus (parehong output ng training)
+if len(reference_embeddings) != len(reference_texts):
+    raise RuntimeError(
+        f"Reference embeddings ({len(reference_embeddings)} rows, {EMBEDDINGS_PATH}) do not match "
+        f"the reference corpus ({len(reference_texts)} texts, {REFERENCE_CORPUS_PATH}). "
+        f"Re-run training/train_multilingual.py, or delete {EMBEDDINGS_PATH} to recompute it."
+    )
+
+projection = None
+if PROJECTION_DIM:
+    print(f"⚡ Loading {PROJECTION_DIM}-d embedding projection...")
+    if os.path.exists(PROJECTION_PATH):
+        projection, projected_embeddings = load_projection(PROJECTION_PATH)
+    # Digest ng source embeddings: nire-refit pagkatapos ng retrain kahit pareho ang bilang ng rows
+    if projection is None or is_stale(projection, reference_embeddings):
+        print("⚡ Fitting projection on reference embeddings (one-time)...")
+        save_projection(PROJECTION_PATH, fit_projection(reference_embeddings, PROJECTION_DIM), reference_embeddings)
+        projection, projected_embeddings = load_projection(PROJECTION_PATH)
+    reference_embeddings = projected_embeddings
 
 print(f"✅ Loaded {len(reference_texts)} reference samples.")
 
@@ -87,6 +164,8 @@ def predict_lstm(text, maxlen=300):
 def predict_semantic(text):
     # encode with transformer -> numpy vector
     emb = transformer_model.encode(text, convert_to_numpy=True)
+    if projection is not None:
+        emb = projection.transform(emb)
     # use sklearn cosine_similarity (robust with numpy)
     scores = cosine_similarity(emb.reshape(1, -1), reference_embeddings).flatten()
     idx = int(np.argmax(scores))
@@ -119,8 +198,38 @@ def detect_language(text):
     non_ascii_ratio = non_ascii / len(chars)
     return "tl" if non_ascii_ratio > 0.2 else "en"
 
-def check_plagiarism_single(input_text):
+def decide_label(lstm_range, semantic_range, threshold):
+    # Ibalik ang label kung pareho ito sa buong range ng posibleng scores, kung hindi ay None.
+    # Kapag exact ang scores (lo == hi), ito mismo ang graded label logic.
+    lstm_lo, lstm_hi = lstm_range
+    sem_lo, sem_hi = semantic_range
+    combined_lo = WEIGHT_LSTM * lstm_lo + WEIGHT_SEMANTIC * sem_lo
+    combined_hi = WEIGHT_LSTM * lstm_hi + WEIGHT_SEMANTIC * sem_hi
+    gate_failed = lstm_hi < LSTM_GATE or sem_hi < SEMANTIC_GATE
+
+    if combined_hi < threshold - SUSPICIOUS_MARGIN:
+        return "Original"
+    if combined_lo >= threshold:
+        if gate_failed:
+            return "Suspicious"
+        if lstm_lo >= LSTM_GATE and sem_lo >= SEMANTIC_GATE:
+            return "Plagiarized"
+        return None
+    if combined_lo >= threshold - SUSPICIOUS_MARGIN and (combined_hi < threshold or gate_failed):
+        return "Suspicious"
+    return None
+
+def semantic_with_penalty(input_text, lang):
+    semantic_score, closest_text = predict_semantic(input_text)
+    # Language mismatch penalty
+    if lang != detect_language(closest_text):
+        semantic_score *= LANG_MISMATCH_PENALTY
+    return semantic_score, closest_text
+
+def check_plagiarism_single(input_text, cascade=None):
     # Gumawa ng function para sa iisang text block (isang sentence)
+    if cascade is None:
+        cascade = CASCADE_MODE
     if not input_text or len(input_text.strip()) < 10:
         return {
             "label": "Original",
@@ -132,37 +241,34 @@ def check_plagiarism_single(input_text):
             "text": input_text # Idinagdag ang original text
         }
 
-    lstm_prob = predict_lstm(input_text)
-    semantic_score, closest_text = predict_semantic(input_text)
-
-    # Weighted combination (tunable)
-    weight_lstm = 0.4
-    weight_semantic = 0.6
-    combined_score = weight_lstm * lstm_prob + weight_semantic * semantic_score
-
     lang = detect_language(input_text)
-    lang_closest = detect_language(closest_text)
-
-    # Language mismatch penalty
-    if lang != lang_closest:
-        semantic_score *= 0.85  # 15% penalty
-        combined_score = weight_lstm * lstm_prob + weight_semantic * semantic_score
-        
-    # conservative starting thresholds - tune with validation set
-    threshold = 0.78 if lang == "tl" else 0.72
+    threshold = THRESHOLDS.get(lang, THRESHOLDS["en"])
 
-    # graded labels
-    if combined_score >= threshold:
-        if lstm_prob < 0.55 or semantic_score < 0.60:
-            label = "Suspicious"
+    if cascade:
+        # Bounds ng hindi pa natatakbong stage: [0, 1] para sa pareho
+        if CASCADE_FIRST_STAGE == "semantic":
+            semantic_score, closest_text = semantic_with_penalty(input_text, lang)
+            label = decide_label((0.0, 1.0), (semantic_score, semantic_score), threshold)
+            if label is not None:
+                return cascade_result(input_text, label, None, semantic_score, closest_text, "lstm")
+            lstm_prob = predict_lstm(input_text)
         else:
-            label = "Plagiarized"
-    elif combined_score >= (threshold - 0.10):
-        label = "Suspicious"
+            lstm_prob = predict_lstm(input_text)
+            label = decide_label((lstm_prob, lstm_prob), (0.0, 1.0), threshold)
+            if label is not None:
+                return cascade_result(input_text, label, lstm_prob, None, "", "semantic")
+            semantic_score, closest_text = semantic_with_penalty(input_text, lang)
     else:
-        label = "Original"
+        lstm_prob = predict_lstm(input_text)
+        semantic_score, closest_text = semantic_with_penalty(input_text, lang)
 
-    return {
+    # Weighted combination (tunable)
+    combined_score = WEIGHT_LSTM * lstm_prob + WEIGHT_SEMANTIC * semantic_score
+
+    # graded labels
+    label = decide_label((lstm_prob, lstm_prob), (semantic_score, semantic_score), threshold)
+
+    result = {
         "label": label,
         "confidence": round(combined_score * 100, 2),
         "lstm_prob": round(lstm_prob, 3),
@@ -171,32 +277,34 @@ def check_plagiarism_single(input_text):
         "combined_score": round(combined_score, 3),
         "text": input_text # Idinagdag ang original text
     }
-
-def split_into_sentences(text):
-    # Simpleng regex para mag-split sa punctuation habang kinukuha rin ang punctuation
-    sentences = re.split(r'([.!?])\s*', text)
-    if not sentences:
-        return []
-        
-    # Pagsamahin muli ang sentence at ang kanyang punctuation
-    result = []
-    i = 0
-    while i < len(sentences) - 1:
-        if sentences[i].strip():
-            result.append(sentences[i].strip() + sentences[i+1])
-        i += 2
-    
-    # Kunin ang huling piraso kung may natira (na walang punctuation)
-    if i < len(sentences) and sentences[i].strip():
-        result.append(sentences[i].strip())
-        
+    if cascade:
+        result["skipped"] = []
     return result
 
+def cascade_result(input_text, label, lstm_prob, semantic_score, closest_text, skipped_stage):
+    # Resulta kapag nilaktawan ang isang stage: null ang score nito at
+    # ang combined_score ay ang pinakamataas na posibleng value (upper bound)
+    lstm_hi = 1.0 if lstm_prob is None else lstm_prob
+    sem_hi = 1.0 if semantic_score is None else semantic_score
+    combined_hi = WEIGHT_LSTM * lstm_hi + WEIGHT_SEMANTIC * sem_hi
+    return {
+        "label": label,
+        "confidence": round(combined_hi * 100, 2),
+        "lstm_prob": None if lstm_prob is None else round(lstm_prob, 3),
+        "semantic_similarity": None if semantic_score is None else round(semantic_score, 3),
+        "closest_text": closest_text,
+        "combined_score": round(combined_hi, 3),
+        "text": input_text,
+        "skipped": [skipped_stage],
+    }
+
+
 # --------------------------
 # API Pydantic Models
 # --------------------------
 class PlagRequest(BaseModel):
     text: str
+    cascade: Optional[bool] = None  # None = gamitin ang CASCADE_MODE ng server
 
 # --------------------------
 # API Endpoints
@@ -207,22 +315,40 @@ def plagiarism_check_root(request: PlagRequest):
     return {"message": "PlagiariShield API is running. Use /check for plagiarism."}
 
 @app.post("/check")
-def plagiarism_check_list(request: PlagRequest):
+def plagiarism_check_list(
+    request: PlagRequest,
+    http_request: Request,
+    fmt: str = Query("full", alias="format"),
+    fields: Optional[str] = None,
+):
+    # Default (walang format/fields, walang Accept-Encoding) = parehong JSON list gaya ng dati
+    try:
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format {fmt!r}. Allowed: {', '.join(FORMATS)}")
+
     try:
         full_text = request.text
         sentences = split_into_sentences(full_text)
-        
-        if not sentences:
-             return [] # Return ng empty list kung walang ma-process
 
         results = []
         for sentence in sentences:
             if sentence.strip(): # Siguraduhin na hindi blanko
-                sentence_result = check_plagiarism_single(sentence)
+                sentence_result = check_plagiarism_single(sentence, cascade=request.cascade)
                 results.append(sentence_result)
-        
-        return results # Ibabalik na ngayon ay isang LIST ng results
-        
+
+        # Ibabalik ang LIST ng results (o compact na {"references", "results"})
+        body, media_type, headers = encode_response(
+            results,
+            fmt=fmt,
+            fields=selected_fields,
+            accept=http_request.headers.get("accept", ""),
+            accept_encoding=http_request.headers.get("accept-encoding", ""),
+        )
+        return Response(content=body, media_type=media_type, headers=headers)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
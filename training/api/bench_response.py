@@ -0,0 +1,147 @@
+# bench_response.py
+# Bytes-on-wire at serialization time ng /check response sa bawat encoding,
+# kumpara sa kasalukuyang format (buong JSON list).
+#
+# Default: totoong text. Ang closest_text ay reference chunks, at ang sentences
+# ay hinati (gaya ng /check) mula sa validation corpus. Ang --synthetic ay
+# gumagamit ng 20-word vocabulary na sobrang dali i-compress, kaya upper bound
+# lang ng gzip/br savings ang resulta nito.
+#
+# Usage (mula sa training/ folder):
+#   python -m api.bench_response --sentences 400
+#   python -m api.bench_response --synthetic
+import os
+import sys
+import time
+import random
+import argparse
+
+from api.response_encoding import (
+    encode_response, parse_fields, MSGPACK_AVAILABLE, BROTLI_AVAILABLE, MSGPACK_MEDIA_TYPE,
+)
+
+REFERENCE_CORPUS_PATH = "data/reference_corpus_multilingual"
+SENTENCE_CORPUS_PATH = "data/validation_corpus_multilingual"
+# Mga field na talagang ginagamit ng Flutter app (report_screen.dart)
+APP_FIELDS = "text,label,confidence,closest_text"
+# Para lang sa --synthetic (upper bound)
+WORDS = ("ang pagbabago ng klima ay malaking suliranin sa ating bansa "
+         "climate change is one of the biggest problems facing the country today").split()
+
+
+def _random_text(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def corpus_sentences(corpus_path, n_sentences, rng):
+    """Magkakasunod na sentences mula sa corpus, hinati gaya ng /check (parang isang isinumiteng dokumento)."""
+    from training.corpus_store import load_corpus
+    from training.sentences import split_into_sentences
+
+    corpus = load_corpus(corpus_path)
+    sentences = []
+    start = rng.randrange(len(corpus))
+    for offset in range(len(corpus)):
+        sentences += [s for s in split_into_sentences(corpus[(start + offset) % len(corpus)]) if s.strip()]
+        if len(sentences) >= n_sentences:
+            break
+    return sentences[:n_sentences]
+
+
+def build_results(sentences, reference_texts, n_references, rng):
+    """Kahawig ng /check output: bawat sentence ay may closest_text (reference chunk, ~1500 chars)."""
+    references = rng.sample(reference_texts, min(n_references, len(reference_texts)))
+    results = []
+    for sentence in sentences:
+        lstm_prob = rng.random()
+        semantic = rng.uniform(0.4, 1.0)
+        combined = 0.4 * lstm_prob + 0.6 * semantic
+        results.append({
+            "label": rng.choice(("Original", "Suspicious", "Plagiarized")),
+            "confidence": round(combined * 100, 2),
+            "lstm_prob": round(lstm_prob, 3),
+            "semantic_similarity": round(semantic, 3),
+            "closest_text": rng.choice(references),
+            "combined_score": round(combined, 3),
+            "text": sentence,
+        })
+    return results
+
+
+def synthetic_results(n_sentences, n_references, rng):
+    sentences = [_random_text(rng, rng.randint(8, 30)) + "." for _ in range(n_sentences)]
+    reference_texts = [_random_text(rng, 220) for _ in range(n_references)]
+    return build_results(sentences, reference_texts, n_references, rng)
+
+
+def variants():
+    yield "full json (current)", dict(fmt="full")
+    yield "full json + gzip", dict(fmt="full", accept_encoding="gzip")
+    if BROTLI_AVAILABLE:
+        yield "full json + br", dict(fmt="full", accept_encoding="br")
+    yield "compact json", dict(fmt="compact")
+    yield "compact json + gzip", dict(fmt="compact", accept_encoding="gzip")
+    if BROTLI_AVAILABLE:
+        yield "compact json + br", dict(fmt="compact", accept_encoding="br")
+    if MSGPACK_AVAILABLE:
+        yield "compact msgpack", dict(fmt="compact", accept=MSGPACK_MEDIA_TYPE)
+        yield "compact msgpack + gzip", dict(fmt="compact", accept=MSGPACK_MEDIA_TYPE, accept_encoding="gzip")
+    yield "compact app fields + gzip", dict(fmt="compact", fields=parse_fields(APP_FIELDS), accept_encoding="gzip")
+    if BROTLI_AVAILABLE:
+        yield "compact app fields + br", dict(fmt="compact", fields=parse_fields(APP_FIELDS), accept_encoding="br")
+
+
+def bench(results, repeats=20):
+    rows = []
+    for name, kwargs in variants():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            body, _, _ = encode_response(results, **kwargs)
+        rows.append((name, len(body), (time.perf_counter() - start) * 1000 / repeats))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /check response encodings")
+    parser.add_argument("--sentences", type=int, default=400)
+    parser.add_argument("--references", type=int, default=60, help="Distinct closest_text chunks")
+    parser.add_argument("--corpus", default=REFERENCE_CORPUS_PATH, help="Corpus store to draw closest_text chunks from")
+    parser.add_argument("--sentence-corpus", default=SENTENCE_CORPUS_PATH,
+                        help="Corpus store to split into query sentences")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Use a 20-word synthetic vocabulary (compression ratios are an upper bound)")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    synthetic = args.synthetic
+    if not synthetic:
+        missing = [p for p in (args.corpus, args.sentence_corpus) if not os.path.exists(os.path.join(p, "meta.json"))]
+        if missing:
+            print(f"⚠️ Corpus not found: {', '.join(missing)} (run training/train_multilingual.py); using synthetic text.")
+            synthetic = True
+    if synthetic:
+        results = synthetic_results(args.sentences, args.references, rng)
+    else:
+        from training.corpus_store import load_corpus
+        sentences = corpus_sentences(args.sentence_corpus, args.sentences, rng)
+        results = build_results(sentences, load_corpus(args.corpus).texts(), args.references, rng)
+
+    rows = bench(results, repeats=args.repeats)
+    baseline_bytes = rows[0][1]
+    if synthetic:
+        print("⚠️ SYNTHETIC TEXT (20-word vocabulary): compression ratios below are an upper bound, "
+              "not representative of real responses.")
+    else:
+        print(f"Text: sentences from {args.sentence_corpus}, closest_text from {args.corpus}")
+    print(f"{len(results)} sentences, {args.references} distinct references "
+          f"(msgpack: {'yes' if MSGPACK_AVAILABLE else 'not installed'}, "
+          f"brotli: {'yes' if BROTLI_AVAILABLE else 'not installed'})")
+    print(f"{'encoding':<28} {'bytes':>10} {'vs current':>11} {'encode ms':>10}")
+    for name, size, ms in rows:
+        print(f"{name:<28} {size:>10} {size / baseline_bytes * 100:>10.1f}% {ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
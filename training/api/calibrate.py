@@ -0,0 +1,276 @@
+# calibrate.py
+# Calibration ng weights, language-mismatch penalty at thresholds ng API.
+#
+# 1. score - isang beses lang patatakbuhin ang LSTM at transformer sa labelled set;
+#            naka-cache ang raw scores at languages bilang NumPy arrays (.npz)
+# 2. sweep - vectorized na pag-sweep ng libu-libong weight/penalty/threshold
+#            combinations sa cache, per-language precision/recall, at pagsulat
+#            ng config file na binabasa ng API sa startup
+#
+# Ang sweep ay para sa "flagged" cutoff (threshold - margin) lang. Ang
+# "Plagiarized" boundary (threshold + gates) ay iniuulat pero hindi tina-tune.
+#
+# Ang labelled set ay ang validation corpus na isinusulat ng
+# training/train_multilingual.py: label 1 = augmented variant ng text na nasa
+# reference index, label 0 = held-out text na walang source sa index.
+#
+# Hindi isinusulat ng sweep ang config kung mas mahina ito sa hand-tuned defaults
+# o halos kapareho lang ng "i-flag lahat"; opt-in din ang paggamit nito sa API
+# (PLAGIARISHIELD_SCORING_CONFIG=1).
+#
+# Usage (mula sa training/ folder, kapareho ng run_api.sh):
+#   python -m api.calibrate score
+#   python -m api.calibrate sweep
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from api.scoring_config import DEFAULTS, SCORING_CONFIG_PATH, flag_all_f1, validate_scoring_config
+
+# --------------------------
+# CONFIG
+# --------------------------
+VALIDATION_CORPUS_PATH = "data/validation_corpus_multilingual"
+SCORES_CACHE_PATH = "models/calibration_scores.npz"
+LANGUAGES = ("en", "tl")
+
+WEIGHT_GRID = np.round(np.arange(0.0, 1.0001, 0.05), 4)
+PENALTY_GRID = np.round(np.arange(0.70, 1.0001, 0.01), 4)
+THRESHOLD_GRID = np.round(np.arange(0.50, 0.9501, 0.0025), 4)
+
+# Hindi sini-sweep ang margin at gates: ang "flagged" (Suspicious o Plagiarized, gaya
+# ng pagbasa ng app) ay combined_score >= threshold - SUSPICIOUS_MARGIN, kaya walang
+# epekto ang gates dito.
+
+
+# --------------------------
+# STEP 1: SCORE (mabagal, isang beses lang)
+# --------------------------
+def score_corpus(corpus_path=VALIDATION_CORPUS_PATH, output_path=SCORES_CACHE_PATH, limit=None):
+    """Patakbuhin ang dalawang model sa bawat sentence at i-cache ang raw scores."""
+    from api import api_multilingual as api
+    from api.evaluate_cascade import load_held_out_corpus
+
+    # Tumatanggi kung verbatim na nasa reference index, o kung hindi tugma ang labels sa index
+    corpus = load_held_out_corpus(corpus_path)
+    count = len(corpus) if limit is None else min(limit, len(corpus))
+
+    lstm_probs, semantic_scores, langs, mismatches, labels = [], [], [], [], []
+    start = time.perf_counter()
+    for i in range(count):
+        for sentence in api.split_into_sentences(corpus[i]):
+            if len(sentence.strip()) < 10:
+                continue  # parehong cutoff ng check_plagiarism_single
+            lang = api.detect_language(sentence)
+            semantic_score, closest_text = api.predict_semantic(sentence)
+            lstm_probs.append(api.predict_lstm(sentence))
+            semantic_scores.append(semantic_score)  # bago ang mismatch penalty
+            langs.append(LANGUAGES.index(lang))
+            mismatches.append(lang != api.detect_language(closest_text))
+            labels.append(int(corpus.labels[i]))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    np.savez(
+        output_path,
+        lstm_prob=np.array(lstm_probs, dtype=np.float64),
+        semantic=np.array(semantic_scores, dtype=np.float64),
+        lang=np.array(langs, dtype=np.int8),
+        mismatch=np.array(mismatches, dtype=bool),
+        label=np.array(labels, dtype=np.int8),
+    )
+    print(f"✅ Scored {len(labels)} sentences from {count} texts in {time.perf_counter() - start:.1f}s -> {output_path}")
+
+
+# --------------------------
+# STEP 2: SWEEP (vectorized)
+# --------------------------
+def sweep_language(lstm_prob, semantic, mismatch, label, weights, penalties, thresholds, margin):
+    """Confusion counts para sa bawat (weight, penalty, threshold) ng isang language.
+
+    Ibinabalik ang (tp, predicted_pos) na may shape (W, P, T), at total positives.
+    Walang loop sa candidates: bawat combined score ay inilalagay sa threshold bin
+    (searchsorted), tapos bincount + reverse cumsum ang nagbibigay ng counts sa
+    lahat ng thresholds nang sabay.
+    """
+    n_w, n_p, n_t = len(weights), len(penalties), len(thresholds)
+    sem_eff = semantic[None, :] * np.where(mismatch[None, :], penalties[:, None], 1.0)  # (P, N)
+    combined = (weights[:, None, None] * lstm_prob[None, None, :]
+                + (1.0 - weights)[:, None, None] * sem_eff[None, :, :])  # (W, P, N)
+
+    # bins[..., n] = ilang cutoffs ang <= combined; flagged sa threshold t kung t < bins
+    cutoffs = thresholds - margin
+    bins = np.searchsorted(cutoffs, combined, side="right").reshape(n_w * n_p, -1)
+    rows = n_w * n_p
+    flat = (bins + (n_t + 1) * np.arange(rows)[:, None]).ravel()
+    hist_all = np.bincount(flat, minlength=rows * (n_t + 1)).reshape(rows, n_t + 1)
+    hist_pos = np.bincount(flat, weights=np.broadcast_to(label, bins.shape).ravel(),
+                           minlength=rows * (n_t + 1)).reshape(rows, n_t + 1)
+
+    predicted_pos = np.cumsum(hist_all[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    tp = np.cumsum(hist_pos[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    return tp.reshape(n_w, n_p, n_t), predicted_pos.reshape(n_w, n_p, n_t), int(label.sum())
+
+
+def _precision_recall_f1(tp, predicted_pos, positives):
+    precision = np.divide(tp, predicted_pos, out=np.zeros_like(tp, dtype=np.float64), where=predicted_pos > 0)
+    recall = tp / positives if positives else np.zeros_like(tp, dtype=np.float64)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(denom), where=denom > 0)
+    return precision, recall, f1
+
+
+def sweep(cache_path=SCORES_CACHE_PATH, margin=DEFAULTS["suspicious_margin"],
+          weights=WEIGHT_GRID, penalties=PENALTY_GRID, thresholds=THRESHOLD_GRID):
+    """Hanapin ang weight/penalty na may pinakamataas na macro F1, na may sariling threshold bawat language."""
+    with np.load(cache_path) as data:
+        cache = {key: data[key] for key in data.files}
+
+    start = time.perf_counter()
+    per_lang = {}
+    for code, lang in enumerate(LANGUAGES):
+        mask = cache["lang"] == code
+        if not mask.any():
+            continue
+        tp, predicted_pos, positives = sweep_language(
+            cache["lstm_prob"][mask], cache["semantic"][mask], cache["mismatch"][mask],
+            cache["label"][mask].astype(np.float64), weights, penalties, thresholds, margin,
+        )
+        precision, recall, f1 = _precision_recall_f1(tp, predicted_pos, positives)
+        per_lang[lang] = {"precision": precision, "recall": recall, "f1": f1, "support": int(mask.sum()),
+                          "positives": positives}
+    if not per_lang:
+        raise ValueError(f"No scored samples in {cache_path}")
+
+    # Pinakamahusay na threshold bawat language para sa bawat (weight, penalty)
+    best_t = {lang: np.argmax(m["f1"], axis=2) for lang, m in per_lang.items()}
+    macro_f1 = np.mean([np.max(m["f1"], axis=2) for m in per_lang.values()], axis=0)  # (W, P)
+    w_idx, p_idx = np.unravel_index(np.argmax(macro_f1), macro_f1.shape)
+    elapsed = time.perf_counter() - start
+
+    config = dict(DEFAULTS)
+    config["weight_lstm"] = float(weights[w_idx])
+    config["weight_semantic"] = float(round(1.0 - weights[w_idx], 4))
+    config["lang_mismatch_penalty"] = float(penalties[p_idx])
+    config["thresholds"] = dict(DEFAULTS["thresholds"])
+    config["metrics"] = {}
+    for lang, m in per_lang.items():
+        t_idx = best_t[lang][w_idx, p_idx]
+        config["thresholds"][lang] = float(thresholds[t_idx])
+        config["metrics"][lang] = {
+            "precision": round(float(m["precision"][w_idx, p_idx, t_idx]), 4),
+            "recall": round(float(m["recall"][w_idx, p_idx, t_idx]), 4),
+            "f1": round(float(m["f1"][w_idx, p_idx, t_idx]), 4),
+            "flag_all_f1": round(flag_all_f1(m["positives"], m["support"]), 4),
+            "support": m["support"],
+        }
+
+    n_combinations = len(weights) * len(penalties) * len(thresholds) * len(per_lang)
+    print(f"Swept {n_combinations} combinations over {len(cache['label'])} samples in {elapsed:.2f}s")
+    return config
+
+
+def evaluate_config(cache_path, config):
+    """Per-language precision/recall ng isang config (hal. ang kasalukuyang defaults)."""
+    config = dict(config)
+    thresholds = config["thresholds"]
+    metrics = {}
+    with np.load(cache_path) as data:
+        for code, lang in enumerate(LANGUAGES):
+            mask = data["lang"] == code
+            if not mask.any():
+                continue
+            tp, predicted_pos, positives = sweep_language(
+                data["lstm_prob"][mask], data["semantic"][mask], data["mismatch"][mask],
+                data["label"][mask].astype(np.float64),
+                np.array([config["weight_lstm"]]), np.array([config["lang_mismatch_penalty"]]),
+                np.array([thresholds.get(lang, thresholds["en"])]), config["suspicious_margin"],
+            )
+            precision, recall, f1 = _precision_recall_f1(tp, predicted_pos, positives)
+            metrics[lang] = {"precision": round(float(precision.item()), 4), "recall": round(float(recall.item()), 4),
+                             "f1": round(float(f1.item()), 4), "support": int(mask.sum())}
+    return metrics
+
+
+def plagiarized_metrics(cache_path, config):
+    """Per-language precision/recall ng "Plagiarized" label ng isang config.
+
+    Plagiarized = combined_score >= threshold at pasado ang LSTM at semantic gates.
+    Gumagalaw ang boundary na ito kapag binago ng sweep ang threshold, kaya
+    iniuulat ito kahit hindi ito ang tina-tune.
+    """
+    thresholds = config["thresholds"]
+    metrics = {}
+    with np.load(cache_path) as data:
+        for code, lang in enumerate(LANGUAGES):
+            mask = data["lang"] == code
+            if not mask.any():
+                continue
+            lstm_prob = data["lstm_prob"][mask]
+            semantic = data["semantic"][mask] * np.where(data["mismatch"][mask], config["lang_mismatch_penalty"], 1.0)
+            label = data["label"][mask]
+            combined = config["weight_lstm"] * lstm_prob + config["weight_semantic"] * semantic
+            predicted = ((combined >= thresholds.get(lang, thresholds["en"]))
+                         & (lstm_prob >= config["lstm_gate"]) & (semantic >= config["semantic_gate"]))
+            precision, recall, f1 = _precision_recall_f1(
+                np.array(float((predicted & (label == 1)).sum())), np.array(float(predicted.sum())), int(label.sum()),
+            )
+            metrics[lang] = {"precision": float(precision), "recall": float(recall),
+                             "f1": float(f1), "support": int(mask.sum())}
+    return metrics
+
+
+def print_metrics(title, metrics):
+    print(title)
+    for lang, m in metrics.items():
+        flag_all = f" | flag-all f1 {m['flag_all_f1']:.4f}" if "flag_all_f1" in m else ""
+        print(f"  {lang}: precision {m['precision']:.4f} | recall {m['recall']:.4f} | "
+              f"f1 {m['f1']:.4f}{flag_all} | n={m['support']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate API scoring weights and thresholds")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    score = sub.add_parser("score", help="Score a labelled corpus once and cache the raw scores")
+    score.add_argument("corpus_path", nargs="?", default=VALIDATION_CORPUS_PATH,
+                       help="Held-out labelled corpus store (default: written by train_multilingual.py)")
+    score.add_argument("--output", default=SCORES_CACHE_PATH)
+    score.add_argument("--limit", type=int, default=None, help="Max number of texts to score")
+
+    run = sub.add_parser("sweep", help="Sweep weights/penalty/thresholds over cached scores")
+    run.add_argument("--cache", default=SCORES_CACHE_PATH)
+    run.add_argument("--output", default=SCORING_CONFIG_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        score_corpus(args.corpus_path, output_path=args.output, limit=args.limit)
+    elif args.command == "sweep":
+        baseline = evaluate_config(args.cache, DEFAULTS)
+        print_metrics("Current (hand-tuned) config, flagged:", baseline)
+        print_metrics("Current (hand-tuned) config, Plagiarized:", plagiarized_metrics(args.cache, DEFAULTS))
+        config = sweep(args.cache)
+        config["baseline_metrics"] = baseline
+        config["plagiarized_metrics"] = plagiarized_metrics(args.cache, config)
+        print_metrics(
+            f"Calibrated, flagged: weight_lstm={config['weight_lstm']} penalty={config['lang_mismatch_penalty']} "
+            f"thresholds={config['thresholds']}",
+            config["metrics"],
+        )
+        print_metrics("Calibrated, Plagiarized (not tuned):", config["plagiarized_metrics"])
+        problems = validate_scoring_config(config)
+        if problems:
+            print("❌ Not writing the scoring config:")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        print(f"✅ Scoring config saved to {args.output} (start the API with PLAGIARISHIELD_SCORING_CONFIG=1 to use it)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
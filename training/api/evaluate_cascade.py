@@ -0,0 +1,106 @@
+# evaluate_cascade.py
+# Sinusukat ang skip rate at latency na natitipid ng cascade mode sa isang labelled set
+# (label 1 = may source sa reference index, label 0 = wala).
+#
+# Usage (mula sa training/ folder, kapareho ng run_api.sh):
+#   python -m api.evaluate_cascade data/validation_corpus_multilingual --limit 300
+import sys
+import time
+import argparse
+import numpy as np
+
+from training.corpus_store import load_corpus, overlap_fraction, shared_source_mask
+from api import api_multilingual as api
+
+# Kapag mas mataas dito ang exact overlap sa reference index, ~1.0 ang semantic scores at walang saysay ang report
+MAX_REFERENCE_OVERLAP = 0.05
+# Pinapayagang bahagi ng texts na hindi tugma ang label sa "may source sa reference index"
+MAX_LABEL_MISMATCH = 0.05
+
+
+def load_held_out_corpus(corpus_path):
+    """I-load ang labelled corpus at tiyaking tama ang labels nito laban sa reference index.
+
+    Label 1 ay dapat may source sa index (paraphrase/augmented variant ng indexed
+    text, hindi exact na kopya); label 0 ay dapat walang source sa index.
+    """
+    corpus = load_corpus(corpus_path)
+    hint = "Use the held-out validation corpus written by training/train_multilingual.py " \
+           "(data/validation_corpus_multilingual)."
+    overlap = overlap_fraction(corpus, api.reference_texts)
+    if overlap > MAX_REFERENCE_OVERLAP:
+        raise ValueError(f"{overlap * 100:.1f}% of {corpus_path} is copied verbatim from the reference index. {hint}")
+    has_source = shared_source_mask(corpus, api.reference_texts)
+    mismatch = float(np.mean(has_source != (np.asarray(corpus.labels) == 1))) if len(corpus) else 0.0
+    if mismatch > MAX_LABEL_MISMATCH:
+        raise ValueError(
+            f"{mismatch * 100:.1f}% of {corpus_path} has a label that disagrees with whether its source "
+            f"is in the reference index. {hint}"
+        )
+    return corpus
+
+
+def evaluate(corpus_path, limit=None):
+    corpus = load_held_out_corpus(corpus_path)
+    count = len(corpus) if limit is None else min(limit, len(corpus))
+
+    sentences, labels = [], []
+    for i in range(count):
+        for sentence in api.split_into_sentences(corpus[i]):
+            if sentence.strip():
+                sentences.append(sentence)
+                labels.append(int(corpus.labels[i]))
+    if not sentences:
+        raise ValueError(f"No sentences found in {corpus_path}")
+
+    def timed(sentence, cascade):
+        start = time.perf_counter()
+        result = api.check_plagiarism_single(sentence, cascade=cascade)
+        return result, (time.perf_counter() - start) * 1000
+
+    # Warm-up para hindi mapunta sa unang timed call ang model/tokenizer init
+    api.check_plagiarism_single(sentences[0], cascade=False)
+
+    full_ms, cascade_ms = [], []
+    full_labels, cascade_labels, skipped = [], [], []
+    for i, sentence in enumerate(sentences):
+        # Salitan ang pagkakasunod para walang mode na laging nakikinabang sa warm caches
+        if i % 2 == 0:
+            full, full_t = timed(sentence, False)
+            fast, fast_t = timed(sentence, True)
+        else:
+            fast, fast_t = timed(sentence, True)
+            full, full_t = timed(sentence, False)
+        full_ms.append(full_t)
+        cascade_ms.append(fast_t)
+
+        full_labels.append(full["label"])
+        cascade_labels.append(fast["label"])
+        skipped.append(fast.get("skipped", []))
+
+    full_ms, cascade_ms, labels = np.array(full_ms), np.array(cascade_ms), np.array(labels)
+    full_flagged = np.array([l != "Original" for l in full_labels])
+    cascade_flagged = np.array([l != "Original" for l in cascade_labels])
+
+    print(f"Sentences: {len(sentences)} (from {count} texts), first stage: {api.CASCADE_FIRST_STAGE}")
+    for stage in ("lstm", "semantic"):
+        rate = np.mean([stage in s for s in skipped])
+        print(f"  skipped {stage}: {rate * 100:.1f}%")
+    print(f"  label agreement with full scoring: {np.mean(np.array(full_labels) == np.array(cascade_labels)) * 100:.2f}%")
+    print(f"  flagged accuracy (full / cascade): {np.mean(full_flagged == labels) * 100:.2f}% / "
+          f"{np.mean(cascade_flagged == labels) * 100:.2f}%")
+    print(f"  mean latency (full / cascade): {full_ms.mean():.2f} ms / {cascade_ms.mean():.2f} ms")
+    print(f"  latency saved: {full_ms.sum() - cascade_ms.sum():.0f} ms total "
+          f"({(1 - cascade_ms.sum() / full_ms.sum()) * 100:.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skip rate and latency saved by cascade scoring")
+    parser.add_argument("corpus_path", help="Labelled corpus store (see training/corpus_store.py)")
+    parser.add_argument("--limit", type=int, default=None, help="Max number of texts to evaluate")
+    args = parser.parse_args(argv)
+    evaluate(args.corpus_path, limit=args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# response_encoding.py
+# Compact na encoding ng /check responses para sa mobile client.
+#
+# - fields=       : ibalik lang ang mga field na kailangan ng client
+# - format=compact: isang beses lang ipinapadala ang bawat closest_text sa
+#                   "references" table; ang bawat result ay may "closest_id"
+# - Accept: application/msgpack -> MessagePack (kung naka-install ang msgpack)
+# - Accept-Encoding: br / gzip  -> compressed body (br kung naka-install ang brotli)
+#
+# Walang model dependencies dito para magamit din ng bench_response.py.
+import json
+import gzip
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except Exception:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+RESULT_FIELDS = (
+    "label", "confidence", "lstm_prob", "semantic_similarity",
+    "closest_text", "combined_score", "text", "skipped",
+)
+FORMATS = ("full", "compact")
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPE = "application/json"
+MIN_COMPRESS_BYTES = 512  # maliit na body: mas malaki pa ang overhead ng compression
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def parse_fields(fields):
+    """'label,text' -> ("label", "text"). None/blank = lahat ng field."""
+    if not fields or not fields.strip():
+        return None
+    selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in selected if f not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(RESULT_FIELDS)}")
+    return selected
+
+
+def build_payload(results, fmt="full", fields=None):
+    """I-trim at (kung compact) i-dedupe ang results bago i-serialize."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}. Allowed: {', '.join(FORMATS)}")
+    if fields is not None:
+        results = [{k: r[k] for k in fields if k in r} for r in results]
+    if fmt == "full":
+        return results
+
+    references, reference_ids = [], {}
+    compact = []
+    for r in results:
+        r = dict(r)
+        if "closest_text" in r:
+            closest_text = r.pop("closest_text")
+            if closest_text not in reference_ids:
+                reference_ids[closest_text] = len(references)
+                references.append(closest_text)
+            r["closest_id"] = reference_ids[closest_text]
+        compact.append(r)
+    return {"references": references, "results": compact}
+
+
+def serialize(payload, accept=""):
+    """Ibalik ang (body bytes, media type) ayon sa Accept header."""
+    if MSGPACK_AVAILABLE and MSGPACK_MEDIA_TYPE in (accept or ""):
+        return msgpack.packb(payload, use_bin_type=True), MSGPACK_MEDIA_TYPE
+    # Parehong settings ng default JSONResponse ng FastAPI
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    return body.encode("utf-8"), JSON_MEDIA_TYPE
+
+
+def _accepts(accept_encoding, coding):
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def compress(body, accept_encoding=""):
+    """Ibalik ang (body, content-encoding o None). Mas gusto ang br kaysa gzip."""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if BROTLI_AVAILABLE and _accepts(accept_encoding, "br"):
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if _accepts(accept_encoding, "gzip"):
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def encode_response(results, fmt="full", fields=None, accept="", accept_encoding=""):
+    """Buong pipeline: trim/dedupe -> serialize -> compress. Ibinabalik ang (body, media type, headers)."""
+    body, media_type = serialize(build_payload(results, fmt, fields), accept)
+    body, content_encoding = compress(body, accept_encoding)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return body, media_type, headers
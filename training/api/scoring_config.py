@@ -0,0 +1,54 @@
+# scoring_config.py
+# Hand-tuned na scoring defaults ng API, iisang pinanggagalingan para sa
+# api_multilingual.py at api/calibrate.py, at ang pag-validate ng calibrated
+# config bago ito gamitin. Walang model na nilo-load dito.
+import json
+
+SCORING_CONFIG_PATH = "models/scoring_config.json"  # output ng api/calibrate.py
+
+# conservative starting thresholds - tune with validation set (python -m api.calibrate)
+DEFAULTS = {
+    "weight_lstm": 0.4,
+    "weight_semantic": 0.6,
+    "lang_mismatch_penalty": 0.85,  # 15% penalty
+    "thresholds": {"en": 0.72, "tl": 0.78},
+    "suspicious_margin": 0.10,
+    "lstm_gate": 0.55,
+    "semantic_gate": 0.60,
+}
+
+# Gaano dapat kalamang ang calibrated F1 sa "i-flag lahat" (hal. kapag walang
+# kinalaman ang labels sa text, ~pareho ang dalawa at walang saysay ang config)
+MIN_F1_GAIN_OVER_FLAG_ALL = 0.05
+
+
+def flag_all_f1(positives, support):
+    """F1 ng pag-flag sa lahat ng sentences (precision = positive rate, recall = 1)."""
+    rate = positives / support if support else 0.0
+    return 2 * rate / (1 + rate) if rate else 0.0
+
+
+def validate_scoring_config(config):
+    """Listahan ng dahilan kung bakit hindi dapat gamitin ang config (walang laman = OK)."""
+    metrics = config.get("metrics")
+    baseline = config.get("baseline_metrics")
+    if not metrics or not baseline:
+        return ["no metrics/baseline_metrics (re-run python -m api.calibrate sweep)"]
+    problems = []
+    for lang, m in metrics.items():
+        if lang in baseline and m["f1"] < baseline[lang]["f1"]:
+            problems.append(f"{lang}: f1 {m['f1']:.4f} is below the hand-tuned {baseline[lang]['f1']:.4f}")
+        if m["f1"] < m.get("flag_all_f1", 1.0) + MIN_F1_GAIN_OVER_FLAG_ALL:
+            problems.append(f"{lang}: f1 {m['f1']:.4f} is no better than flagging everything "
+                            f"({m.get('flag_all_f1', float('nan')):.4f}); check the validation labels")
+    return problems
+
+
+def load_scoring_config(path=SCORING_CONFIG_PATH):
+    """I-load ang calibrated config; ValueError kung hindi ito pumasa sa validate_scoring_config()."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    problems = validate_scoring_config(config)
+    if problems:
+        raise ValueError(f"Refusing scoring config {path}: " + "; ".join(problems))
+    return config
@@ -1,8 +1,8 @@
 import os
-import json
 import random
 from tqdm import tqdm
 import nltk
+from corpus_store import write_samples, content_hash
 
 # Download NLTK resources for English synonym replacement
 from nltk.corpus import wordnet
@@ -18,7 +18,7 @@ PLAGIARIZED_DIR_EN = "../data/plagiarized"
 ORIGINAL_DIR_TL = "../data/originals_tl"
 PLAGIARIZED_DIR_TL = "../data/plagiarized_tl"
 
-AUGMENTED_JSON_PATH = "../data/generated_dataset_multilingual.json"
+AUGMENTED_CORPUS_PATH = "../data/corpus_multilingual"
 
 
 TARGET_SAMPLES_PER_CLASS = 500  # 500 per class → ~1,000 total
@@ -36,8 +36,9 @@ def load_texts(folder):
                     texts.append(content)
     return texts
 
-original_texts = load_texts(ORIGINAL_DIR_EN) + load_texts(ORIGINAL_DIR_TL)
-plag_texts = load_texts(PLAGIARIZED_DIR_EN) + load_texts(PLAGIARIZED_DIR_TL)
+# (text, lang) pairs para alam ang language ng bawat sample sa corpus store
+original_texts = [(t, "en") for t in load_texts(ORIGINAL_DIR_EN)] + [(t, "tl") for t in load_texts(ORIGINAL_DIR_TL)]
+plag_texts = [(t, "en") for t in load_texts(PLAGIARIZED_DIR_EN)] + [(t, "tl") for t in load_texts(PLAGIARIZED_DIR_TL)]
 
 print(f"Loaded {len(original_texts)} original and {len(plag_texts)} plagiarized texts.")
 
@@ -106,13 +107,15 @@ def augment_text(text, num_aug=5):
 def generate_class(texts, label):
     class_samples = []
     while len(class_samples) < TARGET_SAMPLES_PER_CLASS:
-        text = random.choice(texts)
+        text, lang = random.choice(texts)
+        # Iisang source id ang text at ang augmented versions nito
+        source = content_hash(text)
         # Original text itself
-        class_samples.append({"text": text, "label": label})
+        class_samples.append({"text": text, "label": label, "lang": lang, "source": source})
         # Augmented versions
         aug_texts = augment_text(text, num_aug=3)
         for at in aug_texts:
-            class_samples.append({"text": at, "label": label})
+            class_samples.append({"text": at, "label": label, "lang": lang, "source": source})
         # Limit to target
         if len(class_samples) > TARGET_SAMPLES_PER_CLASS:
             class_samples = class_samples[:TARGET_SAMPLES_PER_CLASS]
@@ -132,9 +135,8 @@ dataset += generate_class(plag_texts, 1)
 # Shuffle final dataset
 random.shuffle(dataset)
 
-# Save JSON
-with open(AUGMENTED_JSON_PATH, "w", encoding="utf-8") as f:
-    json.dump(dataset, f, ensure_ascii=False, indent=2)
+# Save corpus store
+write_samples(AUGMENTED_CORPUS_PATH, dataset)
 
-print(f"✅ Augmented multilingual dataset saved to {AUGMENTED_JSON_PATH}")
+print(f"✅ Augmented multilingual dataset saved to {AUGMENTED_CORPUS_PATH}")
 print(f"Total samples: {len(dataset)} (Original + Plagiarized)")
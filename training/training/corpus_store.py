@@ -0,0 +1,281 @@
+# corpus_store.py
+# Compact binary storage para sa multilingual corpus.
+#
+# Layout ng isang corpus directory:
+#   texts.bin     - lahat ng UTF-8 text, magkakadikit (walang separator),
+#                   zlib-compressed kung "compression" == "zlib" sa meta.json
+#   offsets.npy   - int64[n + 1], text i = blob[offsets[i]:offsets[i + 1]] (uncompressed blob)
+#   labels.npy    - int8[n]   (0 = original, 1 = plagiarized)
+#   langs.npy     - int8[n]   (index sa LANGUAGES)
+#   hashes.npy    - uint64[n] (blake2b-64 ng UTF-8 text)
+#   sources.npy   - uint64[n] (optional) source id: content_hash() ng original na
+#                   scraped chunk, kaya iisa ang source ng chunk at ng augmented
+#                   variants nito; wala ito sa mga corpus na galing sa lumang JSON
+#   meta.json     - format version, bilang ng samples, languages, compression
+#
+# Maraming halos-magkaparehong text ang augmented dataset, kaya malaki ang
+# natitipid ng zlib sa texts.bin; isang beses lang ito dine-decompress sa load.
+#
+# Usage (one-time conversion ng lumang JSON dataset):
+#   python corpus_store.py convert ../data/generated_dataset_multilingual.json ../data/corpus_multilingual
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import argparse
+import numpy as np
+
+FORMAT_VERSION = 1
+LANGUAGES = ("en", "tl")
+
+TEXTS_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.npy"
+LABELS_FILE = "labels.npy"
+LANGS_FILE = "langs.npy"
+HASHES_FILE = "hashes.npy"
+SOURCES_FILE = "sources.npy"
+META_FILE = "meta.json"
+
+
+# --------------------------
+# HELPERS
+# --------------------------
+def _hash_bytes(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def content_hash(text):
+    """64-bit blake2b hash ng text (para sa dedup at cache keys)."""
+    return _hash_bytes(text.encode("utf-8"))
+
+
+def guess_language(text):
+    """Same heuristic na ginamit ng train_multilingual.py: may non-ASCII -> 'tl'."""
+    return "tl" if any(ord(c) > 128 for c in text) else "en"
+
+
+def lang_code(lang):
+    return LANGUAGES.index(lang) if lang in LANGUAGES else LANGUAGES.index("tl")
+
+
+# --------------------------
+# WRITER
+# --------------------------
+def write_corpus(path, texts, labels, langs=None, compress=True, sources=None):
+    """Isulat ang texts/labels/langs bilang corpus directory sa `path`.
+
+    Kung walang `langs`, gagamitin ang guess_language() sa bawat text.
+    Kung walang `sources`, walang sources.npy (at buburahin ang luma).
+    """
+    texts = list(texts)
+    labels = list(labels)
+    if len(texts) != len(labels):
+        raise ValueError(f"texts ({len(texts)}) and labels ({len(labels)}) differ in length")
+    if langs is None:
+        langs = [guess_language(t) for t in texts]
+    langs = list(langs)
+    if len(langs) != len(texts):
+        raise ValueError(f"texts ({len(texts)}) and langs ({len(langs)}) differ in length")
+    if sources is not None:
+        sources = list(sources)
+        if len(sources) != len(texts):
+            raise ValueError(f"texts ({len(texts)}) and sources ({len(sources)}) differ in length")
+
+    os.makedirs(path, exist_ok=True)
+    # Burahin muna ang lumang meta.json: kapag naputol ang pagsulat, walang
+    # corpus na magmumukhang kumpleto pero halo ng luma at bagong files
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    encoded = [t.encode("utf-8") for t in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    hashes = np.array([_hash_bytes(b) for b in encoded], dtype=np.uint64)
+
+    blob = b"".join(encoded)
+    with open(os.path.join(path, TEXTS_FILE), "wb") as f:
+        f.write(zlib.compress(blob, 6) if compress else blob)
+    np.save(os.path.join(path, OFFSETS_FILE), offsets)
+    np.save(os.path.join(path, LABELS_FILE), np.asarray(labels, dtype=np.int8))
+    np.save(os.path.join(path, LANGS_FILE), np.array([lang_code(l) for l in langs], dtype=np.int8))
+    np.save(os.path.join(path, HASHES_FILE), hashes)
+    sources_path = os.path.join(path, SOURCES_FILE)
+    if sources is not None:
+        np.save(sources_path, np.asarray(sources, dtype=np.uint64))
+    elif os.path.exists(sources_path):
+        os.remove(sources_path)
+    # meta.json ang huling sinusulat para ang presensya nito = kumpletong corpus
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "count": len(texts),
+            "languages": list(LANGUAGES),
+            "compression": "zlib" if compress else None,
+        }, f)
+
+
+def write_samples(path, samples, compress=True):
+    """Isulat ang listahan ng {"text", "label"[, "lang", "source"]} dicts (format ng mga generator).
+
+    Isinusulat lang ang sources.npy kung may "source" ang lahat ng samples.
+    """
+    texts = [s["text"] for s in samples]
+    labels = [s["label"] for s in samples]
+    langs = [s.get("lang") or guess_language(s["text"]) for s in samples]
+    sources = None
+    if samples and all("source" in s for s in samples):
+        sources = [s["source"] for s in samples]
+    write_corpus(path, texts, labels, langs, compress=compress, sources=sources)
+
+
+# --------------------------
+# READER
+# --------------------------
+class Corpus:
+    """Read-only view ng corpus directory. Lazy ang pag-decode ng bawat text."""
+
+    def __init__(self, path, mmap=True):
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No corpus at {path} (meta.json missing or the last write was interrupted)")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus version {self.meta.get('version')} at {path}")
+
+        mmap_mode = "r" if mmap else None
+        self.path = path
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode=mmap_mode)
+        self.labels = np.load(os.path.join(path, LABELS_FILE), mmap_mode=mmap_mode)
+        self.langs = np.load(os.path.join(path, LANGS_FILE), mmap_mode=mmap_mode)
+        self.hashes = np.load(os.path.join(path, HASHES_FILE), mmap_mode=mmap_mode)
+        sources_path = os.path.join(path, SOURCES_FILE)
+        self.sources = np.load(sources_path, mmap_mode=mmap_mode) if os.path.exists(sources_path) else None
+        with open(os.path.join(path, TEXTS_FILE), "rb") as f:
+            self._blob = f.read()
+        if self.meta.get("compression") == "zlib":
+            self._blob = zlib.decompress(self._blob)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        blob = self._blob
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield blob[start:end].decode("utf-8")
+
+    def texts(self):
+        return list(self)
+
+    def lang(self, idx):
+        return LANGUAGES[int(self.langs[idx])]
+
+    def text_lengths(self):
+        """Byte length ng bawat text (mabilis, galing lang sa offsets)."""
+        return np.diff(self.offsets)
+
+    def samples(self):
+        """Ibalik bilang listahan ng dicts, katulad ng lumang JSON format."""
+        labels = self.labels.tolist()
+        langs = self.langs.tolist()
+        samples = [
+            {"text": text, "label": labels[i], "lang": LANGUAGES[langs[i]]}
+            for i, text in enumerate(self)
+        ]
+        if self.sources is not None:
+            for sample, source in zip(samples, self.sources.tolist()):
+                sample["source"] = source
+        return samples
+
+
+def load_corpus(path, mmap=True):
+    return Corpus(path, mmap=mmap)
+
+
+def overlap_fraction(corpus, other):
+    """Bahagi ng texts sa `corpus` na exact ding nasa `other` (by content hash)."""
+    if len(corpus) == 0:
+        return 0.0
+    return float(np.isin(np.asarray(corpus.hashes), np.asarray(other.hashes)).mean())
+
+
+def shared_source_mask(corpus, other):
+    """Para sa bawat text sa `corpus`: True kung may text sa `other` na galing sa parehong source.
+
+    Nahuhuli nito ang augmented variants (hindi exact na kopya) na hindi nakikita
+    ng overlap_fraction(). Kailangan ng sources.npy sa parehong corpus.
+    """
+    for c in (corpus, other):
+        if c.sources is None:
+            raise ValueError(f"Corpus at {c.path} has no source ids; regenerate it with the corpus generators and training/train_multilingual.py")
+    return np.isin(np.asarray(corpus.sources), np.asarray(other.sources))
+
+
+# --------------------------
+# CONVERTER (one-time, galing sa lumang JSON)
+# --------------------------
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def convert_json(json_path, corpus_path):
+    t0 = time.perf_counter()
+    with open(json_path, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    json_load_s = time.perf_counter() - t0
+
+    write_samples(corpus_path, samples)
+
+    t0 = time.perf_counter()
+    corpus = load_corpus(corpus_path)
+    corpus_open_s = time.perf_counter() - t0
+    texts = corpus.texts()
+    corpus_load_s = time.perf_counter() - t0
+
+    json_size = os.path.getsize(json_path)
+    corpus_size = _dir_size(corpus_path)
+    print(f"✅ Converted {len(texts)} samples: {json_path} -> {corpus_path}")
+    print(f"   size: {json_size / 1e6:.2f} MB (json) -> {corpus_size / 1e6:.2f} MB (corpus)")
+    print(f"   load: {json_load_s * 1000:.1f} ms (json) -> {corpus_open_s * 1000:.1f} ms (corpus, lazy) "
+          f"/ {corpus_load_s * 1000:.1f} ms (corpus, all texts decoded)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PlagiariShield corpus store utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="Convert a JSON dataset into a corpus directory")
+    convert.add_argument("json_path")
+    convert.add_argument("corpus_path")
+
+    info = sub.add_parser("info", help="Print corpus statistics")
+    info.add_argument("corpus_path")
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        convert_json(args.json_path, args.corpus_path)
+    elif args.command == "info":
+        corpus = load_corpus(args.corpus_path)
+        print(f"Samples: {len(corpus)}")
+        for code, lang in enumerate(LANGUAGES):
+            mask = corpus.langs == code
+            print(f"  {lang}: {int(mask.sum())} (plagiarized: {int((corpus.labels[mask] == 1).sum())})")
+        if corpus.sources is not None:
+            print(f"Sources: {len(np.unique(corpus.sources))}")
+        print(f"Size: {_dir_size(args.corpus_path) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# embed_references.py
+# Offline, sharded at resumable na pag-compute ng reference embeddings.
+#
+# 1. Hatiin ang corpus sa shards (naka-sort ayon sa haba para kaunti ang padding)
+# 2. I-encode ang shards gamit ang process pool (isang SentenceTransformer kada worker)
+# 3. Isulat agad ang bawat shard pagkatapos nito
+# 4. Kapag naulit ang job, lalaktawan ang mga tapos nang shard
+# 5. Pagsamahin ang shards sa final .npy (original na row order ng corpus)
+#
+# Usage:
+#   python embed_references.py --workers 4
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+import numpy as np
+
+try:
+    from corpus_store import load_corpus
+except ImportError:  # kapag ini-import mula sa API (training.embed_references)
+    from training.corpus_store import load_corpus
+
+# --------------------------
+# CONFIG
+# --------------------------
+MODEL_NAME = "paraphrase-multilingual-mpnet-base-v2"
+CORPUS_PATH = "../data/reference_corpus_multilingual"
+EMBEDDINGS_PATH = "../models/saved_reference_embeddings_multilingual.npy"
+SHARD_DIR = "../models/reference_embedding_shards"
+SHARD_SIZE = 2048
+BATCH_SIZE = 64
+NUM_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+MANIFEST_FILE = "manifest.json"
+
+
+# --------------------------
+# SHARD PLAN
+# --------------------------
+def plan_shards(corpus, shard_size):
+    """Hatiin ang corpus indices sa shards, naka-sort ayon sa haba ng text.
+
+    Deterministic ito (stable sort) kaya pareho ang plan sa bawat resume.
+    """
+    order = np.argsort(corpus.text_lengths(), kind="stable")
+    return [order[start:start + shard_size] for start in range(0, len(order), shard_size)]
+
+
+def shard_path(shard_dir, shard_id):
+    return os.path.join(shard_dir, f"shard_{shard_id:05d}.npy")
+
+
+def _corpus_digest(corpus):
+    return hashlib.blake2b(np.ascontiguousarray(corpus.hashes).tobytes(), digest_size=16).hexdigest()
+
+
+def _prepare_shard_dir(shard_dir, manifest):
+    """Gumawa ng shard dir; burahin ang lumang shards kung iba na ang corpus/model/shard size."""
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest_path = os.path.join(shard_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if json.load(f) == manifest:
+                return
+        print("⚠️ Corpus or settings changed since the last run, discarding old shards.")
+    for name in os.listdir(shard_dir):
+        if name.startswith("shard_"):
+            os.remove(os.path.join(shard_dir, name))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+# --------------------------
+# WORKER
+# --------------------------
+_worker_model = None
+_worker_corpus = None
+
+
+def _init_worker(model_name, corpus_path, num_threads):
+    global _worker_model, _worker_corpus
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(num_threads)
+    _worker_model = SentenceTransformer(model_name)
+    _worker_corpus = load_corpus(corpus_path)
+
+
+def _encode_shard(shard_id, indices, shard_dir, batch_size, model=None, corpus=None):
+    # model/corpus: para sa in-process encoding; kung wala, ang naka-load sa worker
+    model = model if model is not None else _worker_model
+    corpus = corpus if corpus is not None else _worker_corpus
+    start = time.perf_counter()
+    texts = [corpus[int(i)] for i in indices]
+    embeddings = model.encode(texts, convert_to_numpy=True, batch_size=batch_size, show_progress_bar=False)
+
+    # Atomic write: ang .npy ay lumalabas lang kapag kumpleto na
+    path = shard_path(shard_dir, shard_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, embeddings.astype(np.float32, copy=False))
+    os.replace(tmp_path, path)
+    return shard_id, os.getpid(), len(texts), time.perf_counter() - start
+
+
+# --------------------------
+# MERGE
+# --------------------------
+def merge_shards(shards, shard_dir, count, output_path):
+    """Isulat ang lahat ng shard sa iisang (count, dim) float32 .npy nang hindi hawak lahat sa memory."""
+    dim = np.load(shard_path(shard_dir, 0), mmap_mode="r").shape[1]
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp.npy"
+    merged = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(count, dim))
+    for shard_id, indices in enumerate(shards):
+        merged[indices] = np.load(shard_path(shard_dir, shard_id), mmap_mode="r")
+    merged.flush()
+    del merged
+    os.replace(tmp_path, output_path)
+
+
+# --------------------------
+# JOB
+# --------------------------
+def build_reference_embeddings(corpus_path=CORPUS_PATH, output_path=EMBEDDINGS_PATH, shard_dir=SHARD_DIR,
+                               model_name=MODEL_NAME, shard_size=SHARD_SIZE, batch_size=BATCH_SIZE,
+                               workers=NUM_WORKERS, keep_shards=False, model=None):
+    """Patakbuhin ang embedding job.
+
+    Kapag may ibinigay na `model` (naka-load nang SentenceTransformer), sa
+    kasalukuyang process ine-encode ang shards at hindi gumagawa ng process pool.
+    """
+    corpus = load_corpus(corpus_path)
+    shards = plan_shards(corpus, shard_size)
+    if not shards:
+        raise ValueError(f"Corpus at {corpus_path} is empty.")
+
+    _prepare_shard_dir(shard_dir, {
+        "model": model_name,
+        "count": len(corpus),
+        "shard_size": shard_size,
+        "corpus_digest": _corpus_digest(corpus),
+    })
+    pending = [i for i in range(len(shards)) if not os.path.exists(shard_path(shard_dir, i))]
+    print(f"🔹 {len(corpus)} texts in {len(shards)} shards ({len(shards) - len(pending)} already done).")
+
+    per_worker = {}
+    if pending and model is not None:
+        for done, shard_id in enumerate(pending, start=1):
+            _, pid, n_texts, seconds = _encode_shard(shard_id, shards[shard_id], shard_dir, batch_size,
+                                                     model=model, corpus=corpus)
+            stats = per_worker.setdefault(pid, [0, 0.0])
+            stats[0] += n_texts
+            stats[1] += seconds
+            print(f"   shard {shard_id:05d} done ({done}/{len(pending)}): {n_texts} texts in {seconds:.1f}s")
+    elif pending:
+        workers = max(1, min(workers, len(pending)))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn: ligtas sa torch/TF threads na naka-load na sa parent process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_name, corpus_path, threads)) as pool:
+            futures = [pool.submit(_encode_shard, i, shards[i], shard_dir, batch_size) for i in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                shard_id, pid, n_texts, seconds = future.result()
+                stats = per_worker.setdefault(pid, [0, 0.0])
+                stats[0] += n_texts
+                stats[1] += seconds
+                print(f"   shard {shard_id:05d} done ({done}/{len(pending)}): "
+                      f"{n_texts} texts in {seconds:.1f}s [worker {pid}]")
+
+    print("🔹 Merging shards...")
+    merge_shards(shards, shard_dir, len(corpus), output_path)
+    if not keep_shards:
+        for i in range(len(shards)):
+            os.remove(shard_path(shard_dir, i))
+        os.remove(os.path.join(shard_dir, MANIFEST_FILE))
+
+    for pid, (n_texts, seconds) in sorted(per_worker.items()):
+        print(f"   worker {pid}: {n_texts} texts, {n_texts / max(seconds, 1e-9):.1f} texts/sec")
+    print(f"✅ Reference embeddings saved to {output_path}")
+    return per_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute reference embeddings in resumable shards")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--output", default=EMBEDDINGS_PATH)
+    parser.add_argument("--shard-dir", default=SHARD_DIR)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--keep-shards", action="store_true")
+    args = parser.parse_args(argv)
+
+    build_reference_embeddings(
+        corpus_path=args.corpus,
+        output_path=args.output,
+        shard_dir=args.shard_dir,
+        model_name=args.model,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        keep_shards=args.keep_shards,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
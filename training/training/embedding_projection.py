@@ -0,0 +1,273 @@
+# embedding_projection.py
+# Optional na dimensionality reduction ng reference at query embeddings.
+#
+# Ang projection ay fitted sa reference embeddings at sine-save kasama ng
+# projected reference index (isang .npz), kaya pareho ang map na ginagamit
+# ng API sa references at sa bawat query sentence.
+#
+# Methods:
+#   svd - uncentered SVD ng L2-normalized embeddings. Ito ang linear map na
+#         pinakamahusay mag-preserve ng dot products / cosine, kaya halos hindi
+#         gumagalaw ang semantic scores at thresholds ng API. (default)
+#   pca - classic centered PCA (binabawasan muna ng mean).
+#
+# Ang evaluate ay gumagamit ng sentence queries (gaya ng input ng predict_semantic)
+# mula sa mga text na walang source sa reference index, hindi ng reference rows.
+#
+# Usage:
+#   python embedding_projection.py fit --dim 256
+#   python embedding_projection.py evaluate --dims 64 128 256 384
+import os
+import sys
+import time
+import hashlib
+import argparse
+import numpy as np
+
+try:
+    from corpus_store import load_corpus, shared_source_mask
+    from sentences import split_into_sentences
+    from embed_references import MODEL_NAME
+except ImportError:  # kapag ini-import mula sa API (training.embedding_projection)
+    from training.corpus_store import load_corpus, shared_source_mask
+    from training.sentences import split_into_sentences
+    from training.embed_references import MODEL_NAME
+
+# --------------------------
+# CONFIG
+# --------------------------
+EMBEDDINGS_PATH = "../models/saved_reference_embeddings_multilingual.npy"
+PROJECTION_PATH_TEMPLATE = "../models/reference_projection_{dim}.npz"
+REFERENCE_CORPUS_PATH = "../data/reference_corpus_multilingual"
+QUERY_CORPUS_PATH = "../data/validation_corpus_multilingual"
+MIN_SENTENCE_CHARS = 10  # parehong cutoff ng check_plagiarism_single
+METHODS = ("svd", "pca")
+EVAL_DIMS = (64, 128, 256, 384)
+EVAL_QUERIES = 500
+RANDOM_SEED = 42
+
+
+def projection_path(dim, template=PROJECTION_PATH_TEMPLATE):
+    return template.format(dim=dim)
+
+
+def embeddings_digest(embeddings):
+    """blake2b ng reference embeddings; nakikita nito kapag na-retrain kahit pareho ang bilang ng rows."""
+    data = np.ascontiguousarray(embeddings, dtype=np.float32)
+    digest = hashlib.blake2b(str(data.shape).encode("utf-8"), digest_size=16)
+    digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+# --------------------------
+# PROJECTION
+# --------------------------
+class Projection:
+    """Linear map x -> (normalize(x) - mean) @ components.T, galing sa fit_projection()."""
+
+    def __init__(self, mean, components, method, source_digest=None):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.method = method
+        # embeddings_digest() ng reference embeddings na pinag-fit-an (None sa lumang .npz)
+        self.source_digest = source_digest
+
+    @property
+    def input_dim(self):
+        return self.components.shape[1]
+
+    @property
+    def output_dim(self):
+        return self.components.shape[0]
+
+    def transform(self, x):
+        return (_normalize(x) - self.mean) @ self.components.T
+
+
+def fit_projection(embeddings, dim, method="svd"):
+    """I-fit ang projection sa reference embeddings (n, d) papunta sa `dim` dimensions."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown projection method {method!r}, expected one of {METHODS}")
+    x = _normalize(embeddings)
+    if dim <= 0 or dim > x.shape[1]:
+        raise ValueError(f"Projection dim must be between 1 and {x.shape[1]}, got {dim}")
+
+    mean = x.mean(axis=0) if method == "pca" else np.zeros(x.shape[1], dtype=np.float32)
+    centered = x - mean
+    # d x d eigendecomposition (d = 768) sa halip na SVD ng buong n x d matrix
+    cov = (centered.T @ centered).astype(np.float64)
+    eigvals, eigvecs = np.linalg.eigh(cov)
+    top = np.argsort(eigvals)[::-1][:dim]
+    return Projection(mean, eigvecs[:, top].T, method)
+
+
+def save_projection(path, projection, reference_embeddings):
+    """I-save ang projection kasama ng projected reference index at ng digest ng source embeddings."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    projection.source_digest = embeddings_digest(reference_embeddings)
+    np.savez(
+        path,
+        mean=projection.mean,
+        components=projection.components,
+        method=np.array(projection.method),
+        source_digest=np.array(projection.source_digest),
+        embeddings=projection.transform(reference_embeddings).astype(np.float32),
+    )
+
+
+def load_projection(path):
+    """Ibalik ang (Projection, projected reference embeddings) mula sa .npz."""
+    with np.load(path) as data:
+        source_digest = str(data["source_digest"]) if "source_digest" in data.files else None
+        projection = Projection(data["mean"], data["components"], str(data["method"]), source_digest)
+        return projection, data["embeddings"]
+
+
+def is_stale(projection, reference_embeddings):
+    """True kung ang projection ay hindi fitted sa mga reference embeddings na ito (hal. pagkatapos mag-retrain)."""
+    return projection.source_digest != embeddings_digest(reference_embeddings)
+
+
+# --------------------------
+# EVALUATION
+# --------------------------
+def _scan_latency_ms(queries, index, projection=None):
+    """Average na oras ng per-sentence scan, parehong tawag ng predict_semantic ng API.
+
+    Kasama ang query projection (kung meron) at ang sklearn cosine_similarity,
+    na nire-renormalize ang buong index sa bawat query.
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    start = time.perf_counter()
+    for q in queries:
+        if projection is not None:
+            q = projection.transform(q)
+        scores = cosine_similarity(q.reshape(1, -1), index).flatten()
+        int(np.argmax(scores))
+    return (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+
+def load_query_sentences(corpus_path=QUERY_CORPUS_PATH, reference_corpus_path=REFERENCE_CORPUS_PATH,
+                         n_queries=EVAL_QUERIES, seed=RANDOM_SEED):
+    """Sentences mula sa mga text ng `corpus_path` na walang source sa reference index.
+
+    Hinahati gamit ang split_into_sentences() ng API, kaya kahawig ng aktwal na
+    queries (isang sentence, hindi buong ~1500-char chunk na may kapatid sa index).
+    """
+    corpus = load_corpus(corpus_path)
+    disjoint = ~shared_source_mask(corpus, load_corpus(reference_corpus_path))
+    sentences = [
+        sentence
+        for i in np.flatnonzero(disjoint)
+        for sentence in split_into_sentences(corpus[int(i)])
+        if len(sentence.strip()) >= MIN_SENTENCE_CHARS
+    ]
+    if not sentences:
+        raise ValueError(f"No sentences in {corpus_path} without a source in {reference_corpus_path}")
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(sentences), size=min(n_queries, len(sentences)), replace=False)
+    return [sentences[i] for i in sorted(picked)]
+
+
+def encode_sentences(sentences, model_name=MODEL_NAME):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name).encode(sentences, convert_to_numpy=True, show_progress_bar=False)
+
+
+def evaluate_projection(embeddings, queries, dims=EVAL_DIMS, method="svd"):
+    """Ikumpara ang top-1 match ng projected search sa full-dimension search.
+
+    `embeddings` ang buong reference index (ito rin ang pinag-fit-an ng projection,
+    gaya ng `fit`); `queries` ay embeddings ng sentences na wala ang source sa index
+    (tingnan ang load_query_sentences()).
+    """
+    index = np.asarray(embeddings, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+
+    full_index = _normalize(index)
+    full_queries = _normalize(queries)
+    full_scores = full_queries @ full_index.T
+    full_top1 = np.argmax(full_scores, axis=1)
+    full_best = (full_scores.max(axis=1) + 1.0) / 2.0
+    # Raw (hindi normalized) arrays, gaya ng hawak ng API
+    full_ms = _scan_latency_ms(queries, index)
+
+    rows = [{
+        "dim": index.shape[1],
+        "top1_agreement": 1.0,
+        "score_drift": 0.0,
+        "scan_ms": full_ms,
+        "index_mb": full_index.nbytes / 1e6,
+    }]
+    for dim in dims:
+        projection = fit_projection(index, dim, method=method)
+        stored_index = projection.transform(index).astype(np.float32)  # gaya ng save_projection()
+        proj_index = _normalize(stored_index)
+        proj_queries = _normalize(projection.transform(full_queries))
+        proj_scores = proj_queries @ proj_index.T
+        proj_top1 = np.argmax(proj_scores, axis=1)
+        proj_best = (proj_scores.max(axis=1) + 1.0) / 2.0
+        rows.append({
+            "dim": dim,
+            "top1_agreement": float(np.mean(proj_top1 == full_top1)),
+            # Gaano kalaki ang galaw ng rescaled semantic score na kinukumpara sa thresholds
+            "score_drift": float(np.mean(np.abs(proj_best - full_best))),
+            "scan_ms": _scan_latency_ms(queries, stored_index, projection),
+            "index_mb": stored_index.nbytes / 1e6,
+        })
+    return rows
+
+
+def print_report(rows):
+    full = rows[0]
+    print(f"{'dim':>5} {'top1 agree':>11} {'score drift':>12} {'scan ms':>9} {'speedup':>8} {'index MB':>9} {'saved MB':>9}")
+    for row in rows:
+        print(f"{row['dim']:>5} {row['top1_agreement'] * 100:>10.1f}% {row['score_drift']:>12.4f} "
+              f"{row['scan_ms']:>9.3f} {full['scan_ms'] / max(row['scan_ms'], 1e-9):>7.2f}x "
+              f"{row['index_mb']:>9.2f} {full['index_mb'] - row['index_mb']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reference embedding projection (dimensionality reduction)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("fit", help="Fit a projection and save it with the projected reference index")
+    fit.add_argument("--dim", type=int, required=True)
+    fit.add_argument("--method", choices=METHODS, default="svd")
+    fit.add_argument("--embeddings", default=EMBEDDINGS_PATH)
+    fit.add_argument("--output", default=None)
+
+    evaluate = sub.add_parser("evaluate", help="Top-1 agreement and latency/memory at each dimension")
+    evaluate.add_argument("--dims", type=int, nargs="+", default=list(EVAL_DIMS))
+    evaluate.add_argument("--method", choices=METHODS, default="svd")
+    evaluate.add_argument("--embeddings", default=EMBEDDINGS_PATH)
+    evaluate.add_argument("--queries", type=int, default=EVAL_QUERIES, help="Number of query sentences")
+    evaluate.add_argument("--query-corpus", default=QUERY_CORPUS_PATH,
+                          help="Corpus store to draw query sentences from (texts sharing a source with the index are skipped)")
+    evaluate.add_argument("--reference-corpus", default=REFERENCE_CORPUS_PATH)
+    evaluate.add_argument("--model", default=MODEL_NAME)
+
+    args = parser.parse_args(argv)
+    embeddings = np.load(args.embeddings)
+    if args.command == "fit":
+        output = args.output or projection_path(args.dim)
+        projection = fit_projection(embeddings, args.dim, method=args.method)
+        save_projection(output, projection, embeddings)
+        print(f"✅ {projection.input_dim}->{projection.output_dim} projection ({args.method}) saved to {output}")
+    elif args.command == "evaluate":
+        sentences = load_query_sentences(args.query_corpus, args.reference_corpus, n_queries=args.queries)
+        print(f"Encoding {len(sentences)} query sentences from {args.query_corpus}...")
+        queries = encode_sentences(sentences, model_name=args.model)
+        print_report(evaluate_projection(embeddings, queries, dims=args.dims, method=args.method))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,19 @@
-import json
+from corpus_store import load_corpus, write_corpus
 
 def clean_multilingual_dataset(input_path, output_path):
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    corpus = load_corpus(input_path, mmap=False)
 
-    cleaned = []
-    for item in data:
-        text = item["text"].strip()
+    texts, labels, langs, sources = [], [], [], []
+    for i, text in enumerate(corpus):
+        text = text.strip()
         if len(text.split()) > 3:
-            cleaned.append({"text": text, "label": item["label"]})
+            texts.append(text)
+            labels.append(int(corpus.labels[i]))
+            langs.append(corpus.lang(i))
+            if corpus.sources is not None:
+                sources.append(int(corpus.sources[i]))
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(cleaned, f, ensure_ascii=False, indent=2)
+    write_corpus(output_path, texts, labels, langs,
+                 sources=sources if corpus.sources is not None else None)
 
-    print(f"✅ Cleaned dataset saved to {output_path} (kept {len(cleaned)} samples)")
+    print(f"✅ Cleaned dataset saved to {output_path} (kept {len(texts)} samples)")
@@ -1,5 +1,4 @@
 import os
-import json
 import random
 from newspaper import Article
 from tqdm import tqdm
@@ -10,11 +9,12 @@ from concurrent.futures import ThreadPoolExecutor
 import nltk
 from nltk.corpus import wordnet
 from langdetect import detect
+from corpus_store import write_samples, content_hash
 
 nltk.download("wordnet")
 nltk.download("omw-1.4")
 
-DATA_JSON_PATH = "../data/generated_dataset_multilingual.json"
+CORPUS_PATH = "../data/corpus_multilingual"
 TARGET_SAMPLES_PER_CLASS = 5000
 MAX_CHARS_PER_CHUNK = 1500
 
@@ -168,7 +168,7 @@ def extract_urls_from_sitemap(sitemap_url):
 # -------------------
 # DATASET GENERATION
 # -------------------
-def generate_class(texts, label, target_samples=TARGET_SAMPLES_PER_CLASS):
+def generate_class(texts, label, lang, target_samples=TARGET_SAMPLES_PER_CLASS):
     """Build balanced class dataset with augmentation."""
     class_samples = []
     if not texts:
@@ -176,9 +176,11 @@ def generate_class(texts, label, target_samples=TARGET_SAMPLES_PER_CLASS):
 
     while len(class_samples) < target_samples:
         text = random.choice(texts)
-        class_samples.append({"text": text, "label": label})
+        # Iisang source id ang chunk at ang augmented variants nito
+        source = content_hash(text)
+        class_samples.append({"text": text, "label": label, "lang": lang, "source": source})
         for at in augment_text(text, num_aug=3):
-            class_samples.append({"text": at, "label": label})
+            class_samples.append({"text": at, "label": label, "lang": lang, "source": source})
         if len(class_samples) > target_samples:
             class_samples = class_samples[:target_samples]
     return class_samples
@@ -205,15 +207,13 @@ if __name__ == "__main__":
     print(f"Loaded {len(tagalog_texts)} Tagalog chunks.")
 
     # Generate dataset
-    dataset += generate_class(english_texts, 0)
-    dataset += generate_class(english_texts, 1)
-    dataset += generate_class(tagalog_texts, 0)
-    dataset += generate_class(tagalog_texts, 1)
+    dataset += generate_class(english_texts, 0, "en")
+    dataset += generate_class(english_texts, 1, "en")
+    dataset += generate_class(tagalog_texts, 0, "tl")
+    dataset += generate_class(tagalog_texts, 1, "tl")
 
     random.shuffle(dataset)
 
-    os.makedirs(os.path.dirname(DATA_JSON_PATH), exist_ok=True)
-    with open(DATA_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(dataset, f, ensure_ascii=False, indent=2)
+    write_samples(CORPUS_PATH, dataset)
 
-    print(f"✅ Saved {len(dataset)} samples to {DATA_JSON_PATH}")
+    print(f"✅ Saved {len(dataset)} samples to {CORPUS_PATH}")
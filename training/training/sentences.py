@@ -0,0 +1,25 @@
+# sentences.py
+# Sentence splitting na ginagamit ng API (/check) at ng offline evaluation scripts,
+# para pareho ang hinahating input sa dalawa. Walang model na nilo-load dito.
+import re
+
+
+def split_into_sentences(text):
+    # Simpleng regex para mag-split sa punctuation habang kinukuha rin ang punctuation
+    sentences = re.split(r'([.!?])\s*', text)
+    if not sentences:
+        return []
+        
+    # Pagsamahin muli ang sentence at ang kanyang punctuation
+    result = []
+    i = 0
+    while i < len(sentences) - 1:
+        if sentences[i].strip():
+            result.append(sentences[i].strip() + sentences[i+1])
+        i += 2
+    
+    # Kunin ang huling piraso kung may natira (na walang punctuation)
+    if i < len(sentences) and sentences[i].strip():
+        result.append(sentences[i].strip())
+        
+    return result
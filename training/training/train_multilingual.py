@@ -1,10 +1,10 @@
 # train_multilingual.py (patched)
 import os
-import json
+import sys
 import random
+import subprocess
 import numpy as np
 from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
@@ -13,11 +13,14 @@ from sklearn.model_selection import train_test_split
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 from sklearn.metrics import classification_report
 import pickle
+from corpus_store import load_corpus, write_samples
 
 # --------------------------
 # CONFIG
 # --------------------------
-DATA_JSON_PATH = "../data/generated_dataset_multilingual.json"
+CORPUS_PATH = "../data/corpus_multilingual"
+REFERENCE_CORPUS_PATH = "../data/reference_corpus_multilingual"
+VALIDATION_CORPUS_PATH = "../data/validation_corpus_multilingual"  # held-out, para sa api/calibrate.py
 TOKENIZER_PATH = "../models/tokenizer_v9_multilingual.pkl"
 MODEL_PATH = "../models/plagiarism_model_v9_multilingual.keras"
 EMBEDDINGS_PATH = "../models/saved_reference_embeddings_multilingual.npy"
@@ -27,6 +30,7 @@ MAX_LEN = 300
 EMBEDDING_DIM = 100  # for embedding layer
 VOCAB_SIZE = 20000
 NUM_AUG = 3
+VALIDATION_FRACTION = 0.1  # ng sources bawat language, hindi kasama sa training/reference set
 RANDOM_SEED = 42
 
 random.seed(RANDOM_SEED)
@@ -35,15 +39,37 @@ np.random.seed(RANDOM_SEED)
 # --------------------------
 # LOAD DATA
 # --------------------------
-with open(DATA_JSON_PATH, "r", encoding="utf-8") as f:
-    raw_dataset = json.load(f)
+corpus = load_corpus(CORPUS_PATH)
+if corpus.sources is None:
+    raise ValueError(
+        f"{CORPUS_PATH} has no source ids (sources.npy). Regenerate it with "
+        f"scrape_real_dataset_bulk.py or augment_dataset.py so augmented variants can be grouped."
+    )
 
-# Separate by language (simple heuristic)
-english_texts = [item["text"] for item in raw_dataset if all(ord(c) < 128 or c.isspace() for c in item["text"])]
-tagalog_texts = [item["text"] for item in raw_dataset if any(ord(c) > 128 for c in item["text"])]
+# Separate by language (stored per sample sa corpus store), at source ng bawat text
+english_texts, tagalog_texts = [], []
+text_source = {}
+for i, text in enumerate(corpus):
+    (english_texts if corpus.lang(i) == "en" else tagalog_texts).append(text)
+    text_source.setdefault(text, int(corpus.sources[i]))
 
 print(f"English: {len(english_texts)} | Tagalog: {len(tagalog_texts)}")
 
+# Held-out sources: ang chunk at lahat ng augmented variants nito ay nasa iisang panig,
+# kaya walang kapatid na variant ng validation text sa training data o sa reference index
+def split_sources(texts, fraction=VALIDATION_FRACTION):
+    sources = sorted({text_source[t] for t in texts})
+    random.shuffle(sources)
+    held_out = set(sources[:int(len(sources) * fraction)])
+    # Training side: naiiwan ang duplicates, kaya frequency-weighted pa rin ang sampling
+    train = [t for t in texts if text_source[t] not in held_out]
+    val = sorted({t for t in texts if text_source[t] in held_out})
+    return train, val, len(held_out)
+
+english_texts, english_val_texts, english_val_sources = split_sources(english_texts)
+tagalog_texts, tagalog_val_texts, tagalog_val_sources = split_sources(tagalog_texts)
+print(f"Held out for validation - English: {english_val_sources} sources | Tagalog: {tagalog_val_sources} sources")
+
 # --------------------------
 # AUGMENTATION (simple)
 # --------------------------
@@ -73,38 +99,69 @@ def augment_text(text, num_aug=NUM_AUG):
         augmented.append(new_text)
     return augmented
 
-def generate_class(texts, label, target_samples=TARGET_SAMPLES_PER_CLASS):
+def generate_class(texts, label, lang, target_samples=TARGET_SAMPLES_PER_CLASS):
     samples = []
     if not texts:
         return samples
     while len(samples) < target_samples:
         text = random.choice(texts)
-        samples.append({"text": text, "label": label})
+        source = text_source[text]
+        samples.append({"text": text, "label": label, "lang": lang, "source": source})
         for aug in augment_text(text):
-            samples.append({"text": aug, "label": label})
+            samples.append({"text": aug, "label": label, "lang": lang, "source": source})
         if len(samples) > target_samples:
             samples = samples[:target_samples]
     return samples
 
+def generate_validation(val_texts, indexed_samples, lang, target_samples, max_tries=10):
+    """Labelled set para sa calibration/evaluation ng API.
+
+    label 1 = may source sa reference index: bagong augmented variant ng isang
+              indexed text (hindi exact na kopya ng anumang nasa index)
+    label 0 = held-out text, walang source sa reference index
+    """
+    samples = [{"text": text, "label": 0, "lang": lang, "source": text_source[text]}
+               for text in random.sample(val_texts, min(target_samples, len(val_texts)))]
+
+    indexed_texts = {item["text"] for item in indexed_samples}
+    candidates = [item for item in indexed_samples if item["lang"] == lang]
+    positives = 0
+    for _ in range(target_samples * max_tries):
+        if positives >= target_samples or not candidates:
+            break
+        item = random.choice(candidates)
+        variant = augment_text(item["text"], num_aug=1)[0]
+        if variant in indexed_texts:
+            continue  # walang nabago; exact copy ang susukatin nito, hindi paraphrase
+        samples.append({"text": variant, "label": 1, "lang": lang, "source": item["source"]})
+        positives += 1
+    return samples
+
 # --------------------------
 # BUILD DATASET
 # --------------------------
 dataset = []
 
 print("🔹 Generating English samples...")
-dataset += generate_class(english_texts, 0)  # original
-dataset += generate_class(english_texts, 1)  # plagiarized
+dataset += generate_class(english_texts, 0, "en")  # original
+dataset += generate_class(english_texts, 1, "en")  # plagiarized
 
 print("🔹 Generating Tagalog samples...")
-dataset += generate_class(tagalog_texts, 0)  # original
-dataset += generate_class(tagalog_texts, 1)  # plagiarized
+dataset += generate_class(tagalog_texts, 0, "tl")  # original
+dataset += generate_class(tagalog_texts, 1, "tl")  # plagiarized
 
 random.shuffle(dataset)
 print(f"Total dataset: {len(dataset)} samples")
 
+validation_target = max(1, int(TARGET_SAMPLES_PER_CLASS * VALIDATION_FRACTION))
+validation_dataset = []
+for texts, lang in ((english_val_texts, "en"), (tagalog_val_texts, "tl")):
+    validation_dataset += generate_validation(texts, dataset, lang, validation_target)
+random.shuffle(validation_dataset)
+
 # Simple safety: ensure we have some samples
 if len(dataset) < 10:
-    raise ValueError("Dataset is too small. Check DATA_JSON_PATH or scraping output.")
+    raise ValueError("Dataset is too small. Check CORPUS_PATH or scraping output.")
 
 # --------------------------
 # TOKENIZATION
@@ -168,10 +225,16 @@ print(classification_report(y_val, y_pred, digits=4))
 # --------------------------
 # PRECOMPUTE TRANSFORMER EMBEDDINGS (reference set)
 # --------------------------
-transformer_model = SentenceTransformer("paraphrase-multilingual-mpnet-base-v2")
-reference_texts = [item["text"] for item in dataset]
+# I-save ang reference set para magkatugma ang row order ng embeddings at ng texts na binabasa ng API
+write_samples(REFERENCE_CORPUS_PATH, dataset)
+print(f"✅ Reference corpus saved to {REFERENCE_CORPUS_PATH}")
+write_samples(VALIDATION_CORPUS_PATH, validation_dataset)
+print(f"✅ Held-out validation corpus saved to {VALIDATION_CORPUS_PATH} ({len(validation_dataset)} samples)")
+
+# Hiwalay na process ang embedding job (embed_references.py): sharded, parallel at resumable.
+# Subprocess ito dahil ang spawn workers ay muling nag-i-import ng __main__ (itong training script).
 print("Computing transformer embeddings for reference texts (this may take a while)...")
-reference_embeddings = transformer_model.encode(reference_texts, convert_to_numpy=True, show_progress_bar=True, batch_size=64)
-os.makedirs(os.path.dirname(EMBEDDINGS_PATH), exist_ok=True)
-np.save(EMBEDDINGS_PATH, reference_embeddings)
-print(f"✅ Transformer embeddings saved to {EMBEDDINGS_PATH}")
+subprocess.run(
+    [sys.executable, "embed_references.py", "--corpus", REFERENCE_CORPUS_PATH, "--output", EMBEDDINGS_PATH],
+    check=True,
+)